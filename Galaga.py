@@ -1,6 +1,10 @@
+from __future__ import annotations
+
 import random
 import tkinter as tk
 
+from Telemetry import GameSession, TelemetryStore
+
 
 WIDTH = 600
 HEIGHT = 800
@@ -14,30 +18,13 @@ FRAME_MS = 16
 
 
 class GalagaGame:
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, telemetry: TelemetryStore | None = None) -> None:
         self.root = root
+        self.telemetry = telemetry
         self.root.title("Galaga")
         self.root.configure(bg="#05070a")
 
-        self.canvas = tk.Canvas(
-            root,
-            width=WIDTH,
-            height=HEIGHT,
-            bg="#05070a",
-            highlightthickness=0,
-        )
-        self.canvas.grid(row=0, column=0, padx=10, pady=10)
-
-        self.info = tk.Label(
-            root,
-            text="",
-            fg="#e0f2ff",
-            bg="#05070a",
-            font=("Consolas", 12),
-            justify="left",
-            anchor="w",
-        )
-        self.info.grid(row=1, column=0, sticky="we", padx=10, pady=(0, 10))
+        self.build_widgets()
 
         self.keys_pressed: set[str] = set()
         self.player_bullets: list[dict[str, int]] = []
@@ -57,6 +44,7 @@ class GalagaGame:
         self.enemy_direction = 1
         self.enemy_last_move_at = 0
         self.fire_cooldown = 0
+        self.session = GameSession(self.telemetry, "galaga")
 
         self.root.bind("<KeyPress>", self.on_key_press)
         self.root.bind("<KeyRelease>", self.on_key_release)
@@ -65,6 +53,27 @@ class GalagaGame:
         self.update_info()
         self.game_loop()
 
+    def build_widgets(self) -> None:
+        self.canvas = tk.Canvas(
+            self.root,
+            width=WIDTH,
+            height=HEIGHT,
+            bg="#05070a",
+            highlightthickness=0,
+        )
+        self.canvas.grid(row=0, column=0, padx=10, pady=10)
+
+        self.info = tk.Label(
+            self.root,
+            text="",
+            fg="#e0f2ff",
+            bg="#05070a",
+            font=("Consolas", 12),
+            justify="left",
+            anchor="w",
+        )
+        self.info.grid(row=1, column=0, sticky="we", padx=10, pady=(0, 10))
+
     def on_key_press(self, event: tk.Event) -> None:
         key = event.keysym.lower()
         self.keys_pressed.add(key)
@@ -73,6 +82,7 @@ class GalagaGame:
             self.shoot_player_bullet()
         elif key == "p":
             self.paused = not self.paused
+            self.session.set_paused(self.paused)
         elif key == "r" and self.game_over:
             self.reset_game()
 
@@ -82,6 +92,7 @@ class GalagaGame:
             self.keys_pressed.remove(key)
 
     def reset_game(self) -> None:
+        self.finish_session()
         self.player_bullets.clear()
         self.enemy_bullets.clear()
         self.enemies.clear()
@@ -93,8 +104,12 @@ class GalagaGame:
         self.player_x = WIDTH // 2
         self.enemy_direction = 1
         self.enemy_last_move_at = 0
+        self.session = GameSession(self.telemetry, "galaga")
         self.start_new_wave()
 
+    def finish_session(self) -> None:
+        self.session.finish(completed=self.game_over, score=self.score, wave=self.wave, lives=self.lives)
+
     def start_new_wave(self) -> None:
         self.enemies.clear()
         rows = min(6, 3 + self.wave)
@@ -359,26 +374,38 @@ class GalagaGame:
 
     def game_loop(self) -> None:
         if not self.paused and not self.game_over:
-            self.move_player()
-            self.move_player_bullets()
-            self.move_enemy_bullets()
-            self.move_enemy_swarm()
-            self.enemies_fire()
-            self.handle_collisions()
-            self.maybe_next_wave()
-
-            if self.fire_cooldown > 0:
-                self.fire_cooldown -= 1
-
-        self.update_info()
-        self.render()
+            with self.session.measure("update"):
+                self.move_player()
+                self.move_player_bullets()
+                self.move_enemy_bullets()
+                self.move_enemy_swarm()
+                self.enemies_fire()
+                self.handle_collisions()
+                self.maybe_next_wave()
+
+                if self.fire_cooldown > 0:
+                    self.fire_cooldown -= 1
+
+            if self.game_over:
+                self.finish_session()
+
+        with self.session.measure("render", not (self.paused or self.game_over)):
+            self.update_info()
+            self.render()
         self.root.after(FRAME_MS, self.game_loop)
 
 
 def main() -> None:
     root = tk.Tk()
-    game = GalagaGame(root)
-    _ = game
+    telemetry = TelemetryStore()
+    game = GalagaGame(root, telemetry)
+
+    def on_close() -> None:
+        game.finish_session()
+        telemetry.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", on_close)
     root.resizable(False, False)
     root.mainloop()
 
@@ -0,0 +1,585 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import os
+import random
+import time
+import tracemalloc
+
+from Galaga import ENEMY_BULLET_SPEED, WIDTH, GalagaGame
+from Teris import BOARD_HEIGHT, BOARD_WIDTH, PIECES, Tetris
+
+
+SAMPLE_INTERVAL_S = 60
+WARMUP_S = 600
+AUTOPILOT_MS = {"tetris": 400, "galaga": 16}
+TICK_CALLBACKS = {"tetris": "tick", "galaga": "game_loop"}
+STAGE_LABELS = {"tetris": "level", "galaga": "wave"}
+TRACEBACK_DEPTH = 5
+TOP_ALLOCATION_SITES = 10
+MONOTONIC_RATIO = 0.9
+MEMORY_GROWTH_BYTES = 256 * 1024
+SITE_GROWTH_BYTES = 4 * 1024
+ENTITY_GROWTH_MIN = 32
+LATENCY_DRIFT_RATIO = 1.5
+
+
+class HeadlessClock:
+    def __init__(self, root: "HeadlessRoot") -> None:
+        self.root = root
+
+    def call(self, *args: str) -> int:
+        if args == ("clock", "milliseconds"):
+            return self.root.now_ms
+        raise ValueError(f"Unsupported Tcl call: {args}")
+
+    def getint(self, value: int) -> int:
+        return int(value)
+
+
+class HeadlessRoot:
+    # Stands in for tk.Tk: `after` callbacks run on a simulated clock, so the games
+    # advance as fast as the CPU allows instead of waiting on wall time.
+    def __init__(self) -> None:
+        self.now_ms = 0
+        self.jobs: list[tuple[int, int, object]] = []
+        self.cancelled: set[int] = set()
+        self.next_job_id = 0
+        self.tk = HeadlessClock(self)
+
+    def title(self, _text: str) -> None:
+        pass
+
+    def configure(self, **_options: object) -> None:
+        pass
+
+    def bind(self, _sequence: str, _callback: object) -> None:
+        pass
+
+    def protocol(self, _name: str, _callback: object) -> None:
+        pass
+
+    def winfo_fpixels(self, _distance: str) -> float:
+        return 96.0
+
+    def after(self, ms: int, callback) -> int:
+        self.next_job_id += 1
+        heapq.heappush(self.jobs, (self.now_ms + ms, self.next_job_id, callback))
+        return self.next_job_id
+
+    def after_cancel(self, job_id: int) -> None:
+        self.cancelled.add(job_id)
+
+    def run_next(self):
+        while self.jobs:
+            due, job_id, callback = heapq.heappop(self.jobs)
+            if job_id in self.cancelled:
+                self.cancelled.discard(job_id)
+                continue
+            self.now_ms = max(self.now_ms, due)
+            start = time.perf_counter()
+            callback()
+            return callback, time.perf_counter() - start
+        return None, 0.0
+
+
+class HeadlessCanvas:
+    def __init__(self) -> None:
+        self.items = 0
+        self.next_item_id = 0
+
+    def create_item(self, *_args: object, **_options: object) -> int:
+        self.items += 1
+        self.next_item_id += 1
+        return self.next_item_id
+
+    create_line = create_item
+    create_oval = create_item
+    create_polygon = create_item
+    create_rectangle = create_item
+    create_text = create_item
+
+    def delete(self, tag: str) -> None:
+        if tag == "all":
+            self.items = 0
+
+    def grid(self, **_options: object) -> None:
+        pass
+
+
+class HeadlessLabel:
+    def __init__(self) -> None:
+        self.text = ""
+
+    def configure(self, text: str = "", **_options: object) -> None:
+        self.text = text
+
+    def grid(self, **_options: object) -> None:
+        pass
+
+
+class HeadlessTetris(Tetris):
+    def build_widgets(self) -> None:
+        self.canvas = HeadlessCanvas()
+        self.info = HeadlessLabel()
+
+
+class HeadlessGalaga(GalagaGame):
+    # In endless mode one session runs for the whole soak, so waves keep climbing
+    # past the points where swarm speed and fire chance stop increasing.
+    def __init__(self, root: HeadlessRoot, endless: bool = False) -> None:
+        self.endless = endless
+        self.life_refills = 0
+        self.wave_replays = 0
+        super().__init__(root)
+
+    def build_widgets(self) -> None:
+        self.canvas = HeadlessCanvas()
+        self.info = HeadlessLabel()
+
+    def player_hit(self) -> None:
+        if self.endless and self.lives <= 1:
+            self.lives += 3
+            self.life_refills += 1
+        super().player_hit()
+
+    def handle_collisions(self) -> None:
+        super().handle_collisions()
+        if self.endless and self.game_over:
+            # The swarm reached the player line: replay the wave instead of ending the session.
+            self.game_over = False
+            self.wave_replays += 1
+            self.start_new_wave()
+
+
+class TetrisAutopilot:
+    # Greedy placement scored on aggregate height, holes, bumpiness and cleared lines.
+    def __init__(self, game: Tetris) -> None:
+        self.game = game
+        self.restarts = 0
+
+    def step(self) -> None:
+        game = self.game
+        if game.is_game_over:
+            self.restarts += 1
+            game.reset()
+            return
+        if game.is_paused:
+            return
+
+        best = None
+        for rotation in range(len(PIECES[game.current_piece])):
+            for x in range(-3, BOARD_WIDTH):
+                if not game.is_valid(x, game.current_y, rotation):
+                    continue
+                y = game.current_y
+                while game.is_valid(x, y + 1, rotation):
+                    y += 1
+                score = self.evaluate(x, y, rotation)
+                if best is None or score > best[0]:
+                    best = (score, x, rotation)
+
+        if best is not None:
+            game.current_x = best[1]
+            game.current_rotation = best[2]
+        game.hard_drop()
+
+    def evaluate(self, x: int, y: int, rotation: int) -> float:
+        game = self.game
+        filled = {(cx, cy) for cy, row in enumerate(game.board) for cx, cell in enumerate(row) if cell is not None}
+        for bx, by in game.get_blocks(game.current_piece, rotation):
+            filled.add((x + bx, y + by))
+
+        full_rows = [cy for cy in range(BOARD_HEIGHT) if all((cx, cy) in filled for cx in range(BOARD_WIDTH))]
+        cleared = len(full_rows)
+        heights = []
+        holes = 0
+        for cx in range(BOARD_WIDTH):
+            column = [cy for cy in range(BOARD_HEIGHT) if (cx, cy) in filled and cy not in full_rows]
+            if not column:
+                heights.append(0)
+                continue
+            top = min(column)
+            heights.append(BOARD_HEIGHT - top)
+            holes += sum(1 for cy in range(top, BOARD_HEIGHT) if (cx, cy) not in filled)
+
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        return -0.51 * sum(heights) + 0.76 * cleared - 0.36 * holes - 0.18 * bumpiness
+
+
+class GalagaAutopilot:
+    # Dodges bullets about to reach the ship, otherwise tracks the lowest enemy and fires.
+    def __init__(self, game: GalagaGame) -> None:
+        self.game = game
+        self.restarts = 0
+
+    def step(self) -> None:
+        game = self.game
+        game.keys_pressed.clear()
+        if game.game_over:
+            self.restarts += 1
+            game.reset_game()
+            return
+        if game.paused:
+            return
+
+        danger_y = game.player_y - ENEMY_BULLET_SPEED * 25
+        threats = [
+            int(b["x"])
+            for b in game.enemy_bullets
+            if int(b["y"]) > danger_y and abs(int(b["x"]) - game.player_x) < game.player_width
+        ]
+        if threats:
+            nearest = min(threats, key=lambda bx: abs(bx - game.player_x))
+            go_left = nearest >= game.player_x
+            if go_left and game.player_x - game.player_width <= 0:
+                go_left = False
+            elif not go_left and game.player_x + game.player_width >= WIDTH:
+                go_left = True
+            game.keys_pressed.add("left" if go_left else "right")
+            return
+
+        alive = [e for e in game.enemies if e["alive"]]
+        if not alive:
+            return
+        target = max(alive, key=lambda e: (int(e["y"]), -abs(int(e["x"]) - game.player_x)))
+        target_x = int(target["x"])
+        if target_x < game.player_x - 4:
+            game.keys_pressed.add("left")
+        elif target_x > game.player_x + 4:
+            game.keys_pressed.add("right")
+        else:
+            game.shoot_player_bullet()
+
+
+def entity_counts(name: str, game) -> dict[str, int]:
+    if name == "tetris":
+        return {
+            "board_cells": sum(1 for row in game.board for cell in row if cell is not None),
+            "canvas_items": game.canvas.items,
+        }
+    return {
+        "player_bullets": len(game.player_bullets),
+        "enemy_bullets": len(game.enemy_bullets),
+        "enemies": len(game.enemies),
+        "alive_enemies": sum(1 for e in game.enemies if e["alive"]),
+        "canvas_items": game.canvas.items,
+    }
+
+
+def is_monotonic_growth(values: list[float], min_growth: float) -> bool:
+    if len(values) < 3 or values[-1] - values[0] <= min_growth:
+        return False
+    rising = sum(1 for a, b in zip(values, values[1:]) if b >= a)
+    return rising / (len(values) - 1) >= MONOTONIC_RATIO
+
+
+def is_accumulating(values: list[int]) -> bool:
+    # Counts capped by the stage (e.g. Galaga rows = min(6, 3 + wave)) step up once and
+    # then hold; a real accumulation keeps rising in most intervals.
+    if len(values) < 3 or values[-1] - values[0] < ENTITY_GROWTH_MIN:
+        return False
+    rising = sum(1 for a, b in zip(values, values[1:]) if b > a)
+    return rising / (len(values) - 1) > 0.5
+
+
+def format_traceback(traceback: tracemalloc.Traceback) -> str:
+    return " <- ".join(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in reversed(traceback))
+
+
+class AllocationTracker:
+    # Soak.py's own bookkeeping (samples, these series) is filtered out of both the total
+    # and the per-site sizes, so it cannot show up as a leak. Only sites that have never
+    # dropped below their first tracked size keep a series; the rest are discarded.
+    def __init__(self) -> None:
+        self.filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        self.series: dict[tracemalloc.Traceback, list[int]] = {}
+        self.rejected: set[tracemalloc.Traceback] = set()
+        self.snapshots = 0
+
+    def sample(self, track_sites: bool) -> int:
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        stats = snapshot.statistics("traceback")
+        if track_sites:
+            self.snapshots += 1
+            sizes = {stat.traceback: stat.size for stat in stats}
+            for traceback in list(self.series):
+                size = sizes.get(traceback, 0)
+                if size < self.series[traceback][0]:
+                    del self.series[traceback]
+                    self.rejected.add(traceback)
+                else:
+                    self.series[traceback].append(size)
+            for traceback, size in sizes.items():
+                if traceback not in self.series and traceback not in self.rejected:
+                    self.series[traceback] = [size]
+        return sum(stat.size for stat in stats)
+
+    def growing_sites(self) -> list[dict]:
+        sites = [
+            {"site": format_traceback(traceback), "size": series[-1], "growth": series[-1] - series[0]}
+            for traceback, series in self.series.items()
+            if is_monotonic_growth(series, SITE_GROWTH_BYTES)
+        ]
+        sites.sort(key=lambda site: site["growth"], reverse=True)
+        return sites[:TOP_ALLOCATION_SITES]
+
+
+def reservoirs_full(game) -> bool:
+    timer = game.session.timer
+    return all(len(stats["samples"]) >= timer.reservoir_size for stats in timer.phases.values())
+
+
+def slope_per_hour(xs: list[float], ys: list[float]) -> float:
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x * 3600
+
+
+def play(
+    name: str,
+    hours: float,
+    interval_s: float,
+    endless: bool,
+    warmup_s: float,
+    seed: int,
+    trace: bool,
+) -> dict:
+    random.seed(seed)
+    root = HeadlessRoot()
+    if name == "tetris":
+        game = HeadlessTetris(root)
+        autopilot = TetrisAutopilot(game)
+    else:
+        game = HeadlessGalaga(root, endless)
+        autopilot = GalagaAutopilot(game)
+
+    def drive() -> None:
+        autopilot.step()
+        root.after(AUTOPILOT_MS[name], drive)
+
+    root.after(AUTOPILOT_MS[name], drive)
+
+    tick_name = TICK_CALLBACKS[name]
+    end_ms = int(hours * 3600 * 1000)
+    interval_ms = int(interval_s * 1000)
+    next_sample_ms = interval_ms
+    # Growth is only judged once the FrameTimer reservoirs are full, so bounded buffers
+    # filling up are not mistaken for leaks; past half the run, warm-up ends regardless.
+    warmup_ms = min(int(warmup_s * 1000), end_ms // 4)
+    warmup_end_ms = None
+    latencies: list[float] = []
+    samples: list[dict] = []
+    max_wave = 1
+    tracker = AllocationTracker()
+
+    started = time.perf_counter()
+    if trace:
+        tracemalloc.start(TRACEBACK_DEPTH)
+    try:
+        while root.now_ms < end_ms:
+            callback, elapsed = root.run_next()
+            if callback is None:
+                break
+            if getattr(callback, "__name__", None) == tick_name:
+                latencies.append(elapsed * 1000)
+            if name == "galaga":
+                max_wave = max(max_wave, game.wave)
+
+            if root.now_ms >= next_sample_ms:
+                next_sample_ms += interval_ms
+                latencies.sort()
+                if warmup_end_ms is None and root.now_ms >= warmup_ms:
+                    if reservoirs_full(game) or root.now_ms >= end_ms // 2:
+                        warmup_end_ms = root.now_ms
+                samples.append(
+                    {
+                        "sim_s": root.now_ms / 1000,
+                        "stage": game.wave if name == "galaga" else game.level,
+                        "traced_bytes": tracker.sample(warmup_end_ms is not None) if trace else None,
+                        "ticks": len(latencies),
+                        "tick_mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+                        "tick_p95_ms": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+                        "counts": entity_counts(name, game),
+                    }
+                )
+                latencies = []
+    finally:
+        if trace:
+            tracemalloc.stop()
+
+    return {
+        "samples": samples,
+        "tracker": tracker,
+        "warmup_s": (warmup_end_ms or end_ms) / 1000,
+        "wall_s": time.perf_counter() - started,
+        "restarts": autopilot.restarts,
+        "max_wave": max_wave,
+        "game": game,
+    }
+
+
+def run_soak(
+    name: str,
+    hours: float,
+    interval_s: float = SAMPLE_INTERVAL_S,
+    endless: bool = False,
+    warmup_s: float = WARMUP_S,
+    seed: int | None = None,
+    trace: bool = True,
+) -> dict:
+    # Tick latency comes from an untraced pass: tracemalloc at depth 5 makes every frame
+    # several times slower. Memory comes from a second, traced pass with the same seed;
+    # everything runs on the simulated clock, so both passes play the same game.
+    if seed is None:
+        seed = random.randrange(2**32)
+    timing = play(name, hours, interval_s, endless, warmup_s, seed, trace=False)
+    memory = play(name, hours, interval_s, endless, warmup_s, seed, trace=True) if trace else None
+
+    samples = timing["samples"]
+    diverged_at = None
+    if memory is not None:
+        for sample, traced in zip(samples, memory["samples"]):
+            sample["traced_bytes"] = traced["traced_bytes"]
+            if diverged_at is None and (sample["stage"], sample["counts"]) != (traced["stage"], traced["counts"]):
+                diverged_at = sample["sim_s"]
+
+    report = analyze(
+        name,
+        samples,
+        memory["tracker"] if memory is not None else AllocationTracker(),
+        timing["warmup_s"],
+        timing["restarts"],
+        timing["max_wave"],
+    )
+    report["seed"] = seed
+    report["timing_wall_s"] = timing["wall_s"]
+    report["memory_wall_s"] = memory["wall_s"] if memory is not None else None
+    if diverged_at is not None:
+        report["findings"].append(f"traced pass diverged from the timing pass at {diverged_at:.0f}s; memory columns are approximate")
+    if name == "galaga":
+        game = timing["game"]
+        report["endless"] = {"life_refills": game.life_refills, "wave_replays": game.wave_replays} if endless else None
+    return report
+
+
+def analyze(
+    name: str,
+    samples: list[dict],
+    tracker: AllocationTracker,
+    warmup_s: float,
+    restarts: int,
+    max_wave: int,
+) -> dict:
+    steady = [s for s in samples if s["sim_s"] >= warmup_s]
+    memory = [s["traced_bytes"] for s in steady if s["traced_bytes"] is not None]
+    sim_s = [s["sim_s"] for s in steady]
+    tick_means = [s["tick_mean_ms"] for s in steady]
+    stages = [s["stage"] for s in steady]
+
+    findings = []
+    if is_monotonic_growth(memory, MEMORY_GROWTH_BYTES):
+        findings.append(f"memory grows monotonically: {memory[0]} -> {memory[-1]} bytes")
+
+    for key in steady[0]["counts"] if steady else []:
+        values = [s["counts"][key] for s in steady]
+        if is_accumulating(values):
+            findings.append(f"{key} keeps accumulating: {values[0]} -> {values[-1]}")
+
+    quarter = max(1, len(tick_means) // 4)
+    early = sum(tick_means[:quarter]) / quarter if tick_means else 0.0
+    late = sum(tick_means[-quarter:]) / quarter if tick_means else 0.0
+    if early > 0 and late / early >= LATENCY_DRIFT_RATIO:
+        findings.append(
+            f"tick latency drifts: {early:.3f} -> {late:.3f} ms mean "
+            f"({STAGE_LABELS[name]} {stages[0]} -> {stages[-1]})"
+        )
+
+    # A site is reported when its live size rises across the post-warm-up snapshots,
+    # not merely when the last snapshot is larger than the first.
+    sites = tracker.growing_sites()
+    if sites:
+        findings.append(f"{len(sites)} allocation site(s) grow across {tracker.snapshots} snapshots")
+
+    return {
+        "game": name,
+        "samples": samples,
+        "warmup_s": warmup_s,
+        "snapshots": tracker.snapshots,
+        "restarts": restarts,
+        "max_wave": max_wave if name == "galaga" else None,
+        "latency_slope_ms_per_hour": slope_per_hour(sim_s, tick_means),
+        "findings": findings,
+        "allocation_sites": sites,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Soak report: {report['game']}")
+    print(f"  restarts: {report['restarts']}")
+    if report["max_wave"] is not None:
+        print(f"  max wave: {report['max_wave']}")
+    if report.get("endless"):
+        print(f"  endless: {report['endless']['life_refills']} life refills, {report['endless']['wave_replays']} wave replays")
+    print(f"  seed: {report['seed']}")
+    print(f"  warm-up: {report['warmup_s']:.0f}s simulated, {report['snapshots']} snapshots after it")
+    sim_s = report["samples"][-1]["sim_s"] if report["samples"] else 0.0
+    print(f"  timing pass: {report['timing_wall_s']:.1f}s wall ({sim_s / report['timing_wall_s']:.0f}x), untraced")
+    if report["memory_wall_s"] is not None:
+        print(f"  memory pass: {report['memory_wall_s']:.1f}s wall, tracemalloc depth {TRACEBACK_DEPTH}")
+    print(f"  latency slope: {report['latency_slope_ms_per_hour']:+.4f} ms per simulated hour")
+    print()
+    label = STAGE_LABELS[report["game"]]
+    print(f"  {'sim_s':>8} {label:>5} {'traced_kb':>10} {'ticks':>7} {'mean_ms':>8} {'p95_ms':>8}  counts")
+    for sample in report["samples"]:
+        counts = " ".join(f"{key}={value}" for key, value in sample["counts"].items())
+        traced_kb = "-" if sample["traced_bytes"] is None else f"{sample['traced_bytes'] / 1024:.1f}"
+        print(
+            f"  {sample['sim_s']:>8.0f} {sample['stage']:>5} {traced_kb:>10} {sample['ticks']:>7} "
+            f"{sample['tick_mean_ms']:>8.3f} {sample['tick_p95_ms']:>8.3f}  {counts}"
+        )
+    print()
+    if report["findings"]:
+        print("  Findings:")
+        for finding in report["findings"]:
+            print(f"    - {finding}")
+    else:
+        print("  No memory growth or latency drift detected.")
+    if report["allocation_sites"]:
+        print()
+        print("  Allocation sites growing since warm-up:")
+        for site in report["allocation_sites"]:
+            print(f"    {site['growth']:>+10} B  (now {site['size']} B)  {site['site']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a game headlessly under an autopilot at accelerated time.")
+    parser.add_argument("game", choices=["tetris", "galaga"])
+    parser.add_argument("--hours", type=float, default=2.0, help="simulated hours to play")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL_S, help="simulated seconds between samples")
+    parser.add_argument("--warmup", type=float, default=WARMUP_S, help="simulated seconds before growth is tracked")
+    parser.add_argument(
+        "--endless", action="store_true", help="galaga only: refill lives and replay waves so one session never ends"
+    )
+    parser.add_argument("--seed", type=int, help="random seed shared by the timing and memory passes")
+    parser.add_argument("--no-trace", action="store_true", help="skip the tracemalloc pass and only measure latency")
+    args = parser.parse_args()
+    if args.endless and args.game != "galaga":
+        parser.error("--endless is only supported for galaga")
+
+    print_report(run_soak(args.game, args.hours, args.interval, args.endless, args.warmup, args.seed, not args.no_trace))
+
+
+if __name__ == "__main__":
+    main()
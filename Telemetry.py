@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import os
+import pathlib
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager, nullcontext
+from typing import Iterator
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry.db")
+BATCH_SIZE = 256
+RESERVOIR_SIZE = 1024
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+PERCENTILE_COLUMNS = ("score", "duration_s")
+HISTOGRAM_STEP = math.log(1.01)
+HISTOGRAM_FLOOR = 1e-3
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    score INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    lines INTEGER,
+    level INTEGER,
+    wave INTEGER,
+    lives INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_game_score ON sessions (game, score DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_game_completed_score ON sessions (game, completed, score DESC);
+
+CREATE TABLE IF NOT EXISTS frame_phases (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    game TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean_ms REAL NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    max_ms REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS histograms (
+    game TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (game, metric, completed, bucket)
+) WITHOUT ROWID;
+"""
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(pct / 100 * (len(sorted_values) - 1) + 0.5))
+    return sorted_values[index]
+
+
+def histogram_bucket(value: float) -> int:
+    # Log-scale buckets 1% of the value wide, so reports read a few hundred rows however
+    # many sessions exist. Anything at or below HISTOGRAM_FLOOR (e.g. a score of 0) shares
+    # the lowest bucket.
+    return round(math.log(max(HISTOGRAM_FLOOR, value)) / HISTOGRAM_STEP)
+
+
+def bucket_value(bucket: int) -> float:
+    if bucket <= histogram_bucket(HISTOGRAM_FLOOR):
+        return 0.0
+    return math.exp(bucket * HISTOGRAM_STEP)
+
+
+class FrameTimer:
+    # Keeps a fixed-size reservoir per phase so hour-long sessions stay bounded in memory.
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE) -> None:
+        self.reservoir_size = reservoir_size
+        self.phases: dict[str, dict] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = {"count": 0, "total": 0.0, "max": 0.0, "samples": []}
+            self.phases[phase] = stats
+
+        ms = seconds * 1000
+        stats["count"] += 1
+        stats["total"] += ms
+        stats["max"] = max(stats["max"], ms)
+
+        samples = stats["samples"]
+        if len(samples) < self.reservoir_size:
+            samples.append(ms)
+        else:
+            slot = random.randrange(stats["count"])
+            if slot < self.reservoir_size:
+                samples[slot] = ms
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for phase, stats in self.phases.items():
+            samples = sorted(stats["samples"])
+            result[phase] = {
+                "count": stats["count"],
+                "mean_ms": stats["total"] / stats["count"],
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+                "max_ms": stats["max"],
+            }
+        return result
+
+
+class TelemetryReader:
+    # Query side only: no writer thread and no schema changes.
+    def __init__(self, path: str = DEFAULT_DB_PATH) -> None:
+        self.path = path
+
+    def connect(self) -> sqlite3.Connection:
+        # Read-only, and never creates the file, so a mistyped path fails loudly.
+        conn = sqlite3.connect(pathlib.Path(self.path).resolve().as_uri() + "?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def leaderboard(self, game: str, limit: int = 10, completed_only: bool = True) -> list[dict]:
+        # Sessions quit mid-play (restart or window close) are left out unless asked for.
+        where = "game = ? AND completed = 1" if completed_only else "game = ?"
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, started_at, duration_s, score, completed, lines, level, wave, lives FROM sessions "
+                f"WHERE {where} ORDER BY score DESC LIMIT ?",
+                (game, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def percentile_report(
+        self,
+        game: str,
+        column: str = "score",
+        percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+        completed_only: bool = True,
+    ) -> dict[int, float]:
+        if column not in PERCENTILE_COLUMNS:
+            raise ValueError(f"Unsupported column: {column}")
+        with closing(self.connect()) as conn:
+            return self.histogram_percentiles(conn, game, column, percentiles, completed_only)
+
+    def phase_report(
+        self, game: str, percentiles: tuple[int, ...] = DEFAULT_PERCENTILES, completed_only: bool = True
+    ) -> dict[str, dict[int, float]]:
+        with closing(self.connect()) as conn:
+            metrics = [
+                row["metric"]
+                for row in conn.execute(
+                    "SELECT DISTINCT metric FROM histograms WHERE game = ? AND metric LIKE 'phase:%'", (game,)
+                )
+            ]
+            return {
+                metric.split(":", 1)[1]: self.histogram_percentiles(conn, game, metric, percentiles, completed_only)
+                for metric in metrics
+            }
+
+    def histogram_percentiles(
+        self,
+        conn: sqlite3.Connection,
+        game: str,
+        metric: str,
+        percentiles: tuple[int, ...],
+        completed_only: bool,
+    ) -> dict[int, float]:
+        # Values come back as bucket centres, within about 0.5% of the exact percentile
+        # for anything above HISTOGRAM_FLOOR.
+        where = "game = ? AND metric = ? AND completed = 1" if completed_only else "game = ? AND metric = ?"
+        buckets = conn.execute(
+            f"SELECT bucket, SUM(count) AS count FROM histograms WHERE {where} GROUP BY bucket ORDER BY bucket",
+            (game, metric),
+        ).fetchall()
+        total = sum(row["count"] for row in buckets)
+        if total == 0:
+            return {}
+
+        ranks = sorted((min(total - 1, int(pct / 100 * (total - 1) + 0.5)), pct) for pct in percentiles)
+        result = {}
+        seen = 0
+        for row in buckets:
+            seen += row["count"]
+            while ranks and ranks[0][0] < seen:
+                result[ranks.pop(0)[1]] = bucket_value(row["bucket"])
+            if not ranks:
+                break
+        return {pct: result[pct] for pct in percentiles}
+
+
+class TelemetryStore(TelemetryReader):
+    # Writes go through a queue to a single background thread, which commits each batch
+    # in one transaction; queries open their own short-lived connection.
+    def __init__(self, path: str = DEFAULT_DB_PATH, batch_size: int = BATCH_SIZE) -> None:
+        super().__init__(path)
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.error_logged = False
+        self.closed = False
+        self.queue: queue.Queue[dict | None] = queue.Queue()
+
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+        self.writer = threading.Thread(target=self.writer_loop, name="telemetry-writer", daemon=True)
+        self.writer.start()
+
+    def record_session(
+        self,
+        game: str,
+        *,
+        started_at: float,
+        duration_s: float,
+        score: int,
+        completed: bool,
+        lines: int | None = None,
+        level: int | None = None,
+        wave: int | None = None,
+        lives: int | None = None,
+        phases: dict[str, dict[str, float]] | None = None,
+    ) -> None:
+        if self.closed:
+            return
+        self.queue.put(
+            {
+                "game": game,
+                "started_at": started_at,
+                "duration_s": duration_s,
+                "score": score,
+                "completed": int(completed),
+                "lines": lines,
+                "level": level,
+                "wave": wave,
+                "lives": lives,
+                "phases": phases or {},
+            }
+        )
+
+    def flush(self) -> None:
+        self.queue.join()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join()
+        if self.dropped:
+            logger.warning("telemetry dropped %d session(s) that could not be written", self.dropped)
+
+    def writer_loop(self) -> None:
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                records = [record for record in batch if record is not None]
+                running = len(records) == len(batch)
+                try:
+                    self.write_batch(conn, records)
+                except Exception:
+                    # One bad record rolls back the whole transaction, so retry one at a time
+                    # and drop only the records that fail on their own.
+                    for record in records:
+                        try:
+                            self.write_batch(conn, [record])
+                        except Exception:
+                            self.dropped += 1
+                            if not self.error_logged:
+                                self.error_logged = True
+                                logger.exception("telemetry could not write a %s session", record.get("game"))
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+
+    def write_batch(self, conn: sqlite3.Connection, records: list[dict]) -> None:
+        if not records:
+            return
+        with conn:
+            for record in records:
+                cursor = conn.execute(
+                    "INSERT INTO sessions (game, started_at, duration_s, score, completed, lines, level, wave, lives) "
+                    "VALUES (:game, :started_at, :duration_s, :score, :completed, :lines, :level, :wave, :lives)",
+                    record,
+                )
+                conn.executemany(
+                    "INSERT INTO frame_phases (session_id, game, phase, count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            cursor.lastrowid,
+                            record["game"],
+                            phase,
+                            stats["count"],
+                            stats["mean_ms"],
+                            stats["p50_ms"],
+                            stats["p95_ms"],
+                            stats["p99_ms"],
+                            stats["max_ms"],
+                        )
+                        for phase, stats in record["phases"].items()
+                    ],
+                )
+                metrics = [("score", record["score"]), ("duration_s", record["duration_s"])]
+                metrics += [(f"phase:{phase}", stats["p95_ms"]) for phase, stats in record["phases"].items()]
+                conn.executemany(
+                    "INSERT INTO histograms (game, metric, completed, bucket, count) VALUES (?, ?, ?, ?, 1) "
+                    "ON CONFLICT (game, metric, completed, bucket) DO UPDATE SET count = count + 1",
+                    [
+                        (record["game"], metric, record["completed"], histogram_bucket(value))
+                        for metric, value in metrics
+                    ],
+                )
+
+
+class GameSession:
+    def __init__(self, store: TelemetryStore | None, game: str) -> None:
+        self.store = store
+        self.game = game
+        self.timer = FrameTimer()
+        self.started_at = time.time()
+        self.start_counter = time.perf_counter()
+        self.paused_s = 0.0
+        self.paused_at = None
+        self.finished = False
+
+    def set_paused(self, paused: bool) -> None:
+        # Time spent paused is left out of duration_s.
+        now = time.perf_counter()
+        if paused and self.paused_at is None:
+            self.paused_at = now
+        elif not paused and self.paused_at is not None:
+            self.paused_s += now - self.paused_at
+            self.paused_at = None
+
+    def measure(self, phase: str, active: bool = True):
+        # Frames while paused or after game over are cheap redraws that would skew the summary.
+        if not active:
+            return nullcontext()
+        return self.timer.measure(phase)
+
+    def finish(self, completed: bool, **stats: int) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        self.set_paused(False)
+        if self.store is None:
+            return
+        self.store.record_session(
+            self.game,
+            started_at=self.started_at,
+            duration_s=time.perf_counter() - self.start_counter - self.paused_s,
+            completed=completed,
+            phases=self.timer.summary(),
+            **stats,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query recorded game sessions.")
+    parser.add_argument("command", choices=["leaderboard", "report"])
+    parser.add_argument("game", choices=["tetris", "galaga"])
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--all", action="store_true", help="include sessions quit before game over")
+    args = parser.parse_args()
+
+    reader = TelemetryReader(args.db)
+    try:
+        reader.connect().close()
+    except sqlite3.OperationalError:
+        parser.error(f"cannot open telemetry database: {args.db}")
+
+    if args.command == "leaderboard":
+        for rank, row in enumerate(reader.leaderboard(args.game, args.limit, not args.all), start=1):
+            status = "" if row["completed"] else "  (quit)"
+            print(f"{rank:>3}. {row['score']:>8}  {row['duration_s']:>8.1f}s{status}")
+    else:
+        for column in PERCENTILE_COLUMNS:
+            values = reader.percentile_report(args.game, column, completed_only=not args.all)
+            print(f"{column}: " + "  ".join(f"p{pct}={value:.2f}" for pct, value in values.items()))
+        for phase, values in reader.phase_report(args.game, completed_only=not args.all).items():
+            print(f"{phase} p95_ms: " + "  ".join(f"p{pct}={value:.2f}" for pct, value in values.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
 import random
 import tkinter as tk
 
+from Telemetry import GameSession, TelemetryStore
+
 
 BOARD_WIDTH = 10
 BOARD_HEIGHT = 20
@@ -49,13 +53,42 @@ COLORS = {
 
 
 class Tetris:
-	def __init__(self, root: tk.Tk) -> None:
+	def __init__(self, root: tk.Tk, telemetry: TelemetryStore | None = None) -> None:
 		self.root = root
+		self.telemetry = telemetry
 		self.root.title("Tetris")
 		self.root.configure(bg="#0f0f0f")
 
+		self.build_widgets()
+
+		self.root.bind("<Left>", lambda _event: self.try_move(-1, 0))
+		self.root.bind("<Right>", lambda _event: self.try_move(1, 0))
+		self.root.bind("<Down>", lambda _event: self.soft_drop())
+		self.root.bind("<Up>", lambda _event: self.rotate())
+		self.root.bind("<space>", lambda _event: self.hard_drop())
+		self.root.bind("p", lambda _event: self.toggle_pause())
+		self.root.bind("P", lambda _event: self.toggle_pause())
+		self.root.bind("r", lambda _event: self.reset())
+		self.root.bind("R", lambda _event: self.reset())
+
+		self.board = [[None for _ in range(BOARD_WIDTH)] for _ in range(BOARD_HEIGHT)]
+		self.current_piece = None
+		self.current_rotation = 0
+		self.current_x = 3
+		self.current_y = 0
+		self.score = 0
+		self.lines = 0
+		self.level = 1
+		self.is_game_over = False
+		self.is_paused = False
+		self.tick_job = None
+		self.session = None
+
+		self.reset()
+
+	def build_widgets(self) -> None:
 		self.canvas = tk.Canvas(
-			root,
+			self.root,
 			width=BOARD_WIDTH * CELL_SIZE,
 			height=BOARD_HEIGHT * CELL_SIZE,
 			bg="#111111",
@@ -64,7 +97,7 @@ class Tetris:
 		self.canvas.grid(row=0, column=0, rowspan=6, padx=(10, 6), pady=10)
 
 		self.info = tk.Label(
-			root,
+			self.root,
 			text="",
 			fg="#f0f0f0",
 			bg="#0f0f0f",
@@ -74,7 +107,7 @@ class Tetris:
 		self.info.grid(row=0, column=1, sticky="nw", padx=(6, 12), pady=(10, 0))
 
 		self.hint = tk.Label(
-			root,
+			self.root,
 			text=(
 				"Controls\n"
 				"←/→: Move\n"
@@ -91,34 +124,12 @@ class Tetris:
 		)
 		self.hint.grid(row=1, column=1, sticky="nw", padx=(6, 12), pady=(16, 0))
 
-		self.root.bind("<Left>", lambda _event: self.try_move(-1, 0))
-		self.root.bind("<Right>", lambda _event: self.try_move(1, 0))
-		self.root.bind("<Down>", lambda _event: self.soft_drop())
-		self.root.bind("<Up>", lambda _event: self.rotate())
-		self.root.bind("<space>", lambda _event: self.hard_drop())
-		self.root.bind("p", lambda _event: self.toggle_pause())
-		self.root.bind("P", lambda _event: self.toggle_pause())
-		self.root.bind("r", lambda _event: self.reset())
-		self.root.bind("R", lambda _event: self.reset())
-
-		self.board = [[None for _ in range(BOARD_WIDTH)] for _ in range(BOARD_HEIGHT)]
-		self.current_piece = None
-		self.current_rotation = 0
-		self.current_x = 3
-		self.current_y = 0
-		self.score = 0
-		self.lines = 0
-		self.level = 1
-		self.is_game_over = False
-		self.is_paused = False
-		self.tick_job = None
-
-		self.reset()
-
 	def reset(self) -> None:
 		if self.tick_job is not None:
 			self.root.after_cancel(self.tick_job)
 			self.tick_job = None
+		self.finish_session()
+		self.session = GameSession(self.telemetry, "tetris")
 		self.board = [[None for _ in range(BOARD_WIDTH)] for _ in range(BOARD_HEIGHT)]
 		self.score = 0
 		self.lines = 0
@@ -219,17 +230,25 @@ class Tetris:
 			points = {1: 100, 2: 300, 3: 500, 4: 800}
 			self.score += points.get(cleared, 0) * self.level
 
+	def finish_session(self) -> None:
+		if self.session is not None:
+			self.session.finish(completed=self.is_game_over, score=self.score, lines=self.lines, level=self.level)
+
 	def tick(self) -> None:
 		self.tick_job = None
 		if self.is_game_over:
+			self.finish_session()
 			self.update_info()
 			self.draw()
 			return
-		if not self.is_paused:
-			if not self.try_move(0, 1):
-				self.lock_piece()
-		self.update_info()
-		self.draw()
+		# "tick" covers the whole gravity step; "draw" is timed inside draw() so
+		# redraws triggered by key presses are counted as well.
+		with self.session.measure("tick", not self.is_paused):
+			if not self.is_paused:
+				if not self.try_move(0, 1):
+					self.lock_piece()
+			self.update_info()
+			self.draw()
 		self.schedule_tick()
 
 	def schedule_tick(self) -> None:
@@ -242,6 +261,7 @@ class Tetris:
 		if self.is_game_over:
 			return
 		self.is_paused = not self.is_paused
+		self.session.set_paused(self.is_paused)
 		self.update_info()
 		self.draw()
 
@@ -264,24 +284,33 @@ class Tetris:
 		self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline=COLORS["grid"])
 
 	def draw(self) -> None:
-		self.canvas.delete("all")
-		for y in range(BOARD_HEIGHT):
-			for x in range(BOARD_WIDTH):
-				cell = self.board[y][x]
-				color = COLORS["empty"] if cell is None else COLORS[cell]
-				self.draw_cell(x, y, color)
-
-		if not self.is_game_over:
-			for bx, by in self.get_blocks(self.current_piece, self.current_rotation):
-				px = self.current_x + bx
-				py = self.current_y + by
-				if 0 <= px < BOARD_WIDTH and 0 <= py < BOARD_HEIGHT:
-					self.draw_cell(px, py, COLORS[self.current_piece])
+		with self.session.measure("draw", not (self.is_paused or self.is_game_over)):
+			self.canvas.delete("all")
+			for y in range(BOARD_HEIGHT):
+				for x in range(BOARD_WIDTH):
+					cell = self.board[y][x]
+					color = COLORS["empty"] if cell is None else COLORS[cell]
+					self.draw_cell(x, y, color)
+
+			if not self.is_game_over:
+				for bx, by in self.get_blocks(self.current_piece, self.current_rotation):
+					px = self.current_x + bx
+					py = self.current_y + by
+					if 0 <= px < BOARD_WIDTH and 0 <= py < BOARD_HEIGHT:
+						self.draw_cell(px, py, COLORS[self.current_piece])
 
 
 def main() -> None:
 	root = tk.Tk()
-	Tetris(root)
+	telemetry = TelemetryStore()
+	game = Tetris(root, telemetry)
+
+	def on_close() -> None:
+		game.finish_session()
+		telemetry.close()
+		root.destroy()
+
+	root.protocol("WM_DELETE_WINDOW", on_close)
 	root.resizable(False, False)
 	root.mainloop()
 